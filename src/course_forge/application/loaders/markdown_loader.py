@@ -1,8 +1,5 @@
-from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Protocol
 
 
-class MarkdownLoader(ABC):
-    @abstractmethod
-    def load(self, path: str) -> dict[str, Any]:
-        raise NotImplementedError
+class MarkdownLoader(Protocol):
+    def load(self, path: str) -> dict[str, Any]: ...
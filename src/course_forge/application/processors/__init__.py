@@ -1,19 +1,27 @@
-from .applet_processor import AppletProcessor
-from .asset_bundle_processor import AssetBundleProcessor
-from .block_diagram_processor import BlockDiagramProcessor
-from .ast_processor import ASTProcessor
+from importlib import import_module
+
 from .base import Processor
-from .digital_circuit_processor import DigitalCircuitProcessor
-from .download_link_marker_processor import DownloadLinkMarkerProcessor
-from .download_link_processor import DownloadLinkProcessor
-from .graphviz_processor import GraphvizProcessor
-from .html_minify_processor import HTMLMinifyProcessor
-from .internal_link_processor import InternalLinkProcessor
-from .karnaugh_map_processor import KarnaughMapProcessor
-from .matplotlib_processor import MatplotlibProcessor
-from .mermaid_processor import MermaidProcessor
-from .pulse_waveform_processor import PulseWaveformProcessor
-from .schemdraw_processor import SchemdrawProcessor
+
+# Processors are imported lazily (PEP 562): several of them pull in heavy
+# rendering stacks (schemdraw, matplotlib, graphviz) at module import time,
+# which consumers that only need the Processor interface should not pay for.
+_PROCESSOR_MODULES = {
+    "AppletProcessor": "applet_processor",
+    "AssetBundleProcessor": "asset_bundle_processor",
+    "BlockDiagramProcessor": "block_diagram_processor",
+    "ASTProcessor": "ast_processor",
+    "DigitalCircuitProcessor": "digital_circuit_processor",
+    "DownloadLinkMarkerProcessor": "download_link_marker_processor",
+    "DownloadLinkProcessor": "download_link_processor",
+    "GraphvizProcessor": "graphviz_processor",
+    "HTMLMinifyProcessor": "html_minify_processor",
+    "InternalLinkProcessor": "internal_link_processor",
+    "KarnaughMapProcessor": "karnaugh_map_processor",
+    "MatplotlibProcessor": "matplotlib_processor",
+    "MermaidProcessor": "mermaid_processor",
+    "PulseWaveformProcessor": "pulse_waveform_processor",
+    "SchemdrawProcessor": "schemdraw_processor",
+}
 
 __all__ = [
     "AppletProcessor",
@@ -34,3 +42,12 @@ __all__ = [
     "DownloadLinkMarkerProcessor",
 ]
 
+
+def __getattr__(name: str):
+    module_name = _PROCESSOR_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    processor = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = processor
+    return processor
@@ -22,17 +22,26 @@ class AppletProcessor(Processor):
     )
     
     def execute(self, node: ContentNode, content: str) -> str:
-        matches = list(self.pattern.finditer(content))
-        
-        for match in matches:
+        # Fast-path reject: no container fence means no applet blocks
+        if ":::" not in content:
+            return content
+
+        # Rebuild the document in one pass over the match spans instead of
+        # rescanning and copying the whole string with content.replace.
+        parts: list[str] = []
+        last_end = 0
+
+        for match in self.pattern.finditer(content):
             attributes_raw = match.group("attributes")
             attrs = self._parse_attributes(attributes_raw)
-            
+
             applet_name = attrs.get("name")
             if not applet_name:
-                content = content.replace(match.group(0), '<div class="error">Applet error: "name" attribute is required.</div>')
+                parts.append(content[last_end:match.start()])
+                parts.append('<div class="error">Applet error: "name" attribute is required.</div>')
+                last_end = match.end()
                 continue
-                
+
             height = attrs.get("height", "500px")
             sketch = attrs.get("sketch", "false").lower() == "true"
             centered = attrs.get("centered", "true").lower() == "true"
@@ -54,9 +63,15 @@ class AppletProcessor(Processor):
     <iframe src="{applet_url}" width="100%" height="{height}" frameborder="0" style="border: none;" scrolling="{scrolling}"></iframe>
 </div>
 """
-            content = content.replace(match.group(0), iframe_html)
-            
-        return content
+            parts.append(content[last_end:match.start()])
+            parts.append(iframe_html)
+            last_end = match.end()
+
+        if not parts:
+            return content
+
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _parse_attributes(self, raw_attributes: str) -> dict:
         attrs = {}
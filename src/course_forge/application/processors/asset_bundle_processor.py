@@ -2,6 +2,7 @@ import hashlib
 import os
 import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import csscompressor
@@ -12,18 +13,63 @@ from course_forge.domain.entities import ContentNode
 
 from .base import Processor
 
+# Compiled asset-tag patterns, keyed by (asset_type, base_url). The base_url is
+# part of the key because Config.base_url is only known at runtime; caching here
+# avoids recompiling the same pattern once per processed node.
+_ASSET_PATTERNS: dict[tuple[str, str], re.Pattern] = {}
+
+
+def _asset_pattern(asset_type: str) -> re.Pattern:
+    base_url = Config.base_url or ""
+    key = (asset_type, base_url)
+    pattern = _ASSET_PATTERNS.get(key)
+    if pattern is None:
+        base_url_pattern = re.escape(base_url)
+        if asset_type == "js":
+            pattern = re.compile(
+                rf'<script\s+(?!.*?data-no-bundle)[^>]*?src=["\'](?:{base_url_pattern})?(/js/[^":\' ]+)["\'][^>]*>\s*</script>',
+                re.IGNORECASE,
+            )
+        else:
+            pattern = re.compile(
+                rf'<link\s+(?!.*?data-no-bundle)[^>]*?href=["\'](?:{base_url_pattern})?(/css/[^":\' ]+)["\'][^>]*>',
+                re.IGNORECASE,
+            )
+        _ASSET_PATTERNS[key] = pattern
+    return pattern
+
 
 class AssetBundleProcessor(Processor):
+    __slots__ = ("template_dir", "output_dir")
+
+    # Bundles already written this run, keyed by (output_dir, bundle_rel) and
+    # shared across instances so that pipelines which create one processor per
+    # course only read and minify each unique bundle once.
+    _written_bundles: set[tuple[Path, str]] = set()
+
+    # One lock per asset type: JS and CSS bundles never collide on disk, so
+    # their minification can proceed in parallel while writes of the same
+    # asset type stay serialized.
+    _write_locks = {"js": threading.Lock(), "css": threading.Lock()}
+
+    # Minified output per source file, keyed by (path, size, mtime_ns), so an
+    # asset shared by several bundles is only minified once per run.
+    _minified_cache: dict[tuple[Path, int, int], str] = {}
+
+    # Bundle directories already created, so mkdir(parents=True) only walks
+    # the path once per output directory instead of once per bundle.
+    _prepared_dirs: set[Path] = set()
+
     def __init__(self, template_dir: str, output_dir: str):
         self.template_dir = Path(os.path.abspath(template_dir))
         self.output_dir = Path(os.path.abspath(output_dir))
-        self._lock = threading.Lock()
-        self._written_bundles: set[str] = set()
 
     def _resolve_asset_path(self, asset_rel: str) -> Path | None:
         rel_path = asset_rel.lstrip("/")
         candidate = self.template_dir / rel_path
-        if candidate.exists() and candidate.is_file():
+        # is_file() already returns False for missing paths, so the extra
+        # exists() check only added a second stat() per asset lookup.
+        if candidate.is_file():
             return candidate
         return None
 
@@ -67,6 +113,19 @@ class AssetBundleProcessor(Processor):
             print(f"Warning: Failed to compress {asset_path.name}: {exc}")
             return content
 
+    def _minify_asset(self, asset_path: Path, asset_type: str) -> str:
+        stat = asset_path.stat()
+        key = (asset_path, stat.st_size, stat.st_mtime_ns)
+
+        minified = self._minified_cache.get(key)
+        if minified is None:
+            if asset_type == "js":
+                minified = self._minify_js(asset_path)
+            else:
+                minified = self._minify_css(asset_path)
+            self._minified_cache[key] = minified
+        return minified
+
     def _build_bundle_rel(self, asset_type: str, asset_paths: list[str]) -> str:
         digest = hashlib.sha1("|".join(asset_paths).encode("utf-8")).hexdigest()[:12]
         labels = [Path(asset).stem.replace(".min", "") for asset in asset_paths[:3]]
@@ -78,99 +137,152 @@ class AssetBundleProcessor(Processor):
         if not asset_paths:
             return None
 
+        with self._write_locks[asset_type]:
+            return self._write_bundle_locked(asset_type, asset_paths)
+
+    def _write_bundle_locked(
+        self, asset_type: str, asset_paths: list[str]
+    ) -> str | None:
         bundle_rel = self._build_bundle_rel(asset_type, asset_paths)
-        if bundle_rel in self._written_bundles:
+        if (self.output_dir, bundle_rel) in self._written_bundles:
             return bundle_rel
 
-        contents: list[str] = []
+        resolved: list[Path] = []
         for asset_rel in asset_paths:
             asset_path = self._resolve_asset_path(asset_rel)
             if not asset_path:
                 print(f"Warning: Failed to resolve asset for bundling: {asset_rel}")
                 continue
+            resolved.append(asset_path)
 
-            header = f"\n/* --- BUNDLED: {asset_path.name} --- */\n"
-            if asset_type == "js":
-                contents.append(header + self._minify_js(asset_path) + "\n;\n")
-            else:
-                contents.append(header + self._minify_css(asset_path) + "\n")
-
-        if not contents:
+        if not resolved:
             return None
 
         dst_path = self.output_dir / bundle_rel
-        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        stamp_path = Path(f"{dst_path}.sha")
+        stamp = self._build_source_stamp(resolved)
+
+        # Across full-build restarts the bundle file may already be up to
+        # date; if the recorded source stamp matches, skip minification.
+        if dst_path.is_file():
+            try:
+                if stamp_path.read_text(encoding="utf-8").strip() == stamp:
+                    self._written_bundles.add((self.output_dir, bundle_rel))
+                    return bundle_rel
+            except OSError:
+                pass
+
+        # Reading and minifying each asset is independent work, so dispatch it
+        # to a thread pool; map preserves order, keeping output deterministic.
+        with ThreadPoolExecutor(max_workers=min(8, len(resolved))) as pool:
+            minified = list(
+                pool.map(lambda path: self._minify_asset(path, asset_type), resolved)
+            )
+
+        trailer = "\n;\n" if asset_type == "js" else "\n"
+        contents: list[str] = []
+        for asset_path, minified_content in zip(resolved, minified):
+            contents.append(f"\n/* --- BUNDLED: {asset_path.name} --- */\n")
+            contents.append(minified_content)
+            contents.append(trailer)
+
+        if dst_path.parent not in self._prepared_dirs:
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+            self._prepared_dirs.add(dst_path.parent)
+
+        # writelines streams the pieces straight to the file buffer without
+        # first joining them into one large intermediate string.
         with open(dst_path, "w", encoding="utf-8") as file:
-            file.write("".join(contents))
+            file.writelines(contents)
+
+        try:
+            stamp_path.write_text(stamp, encoding="utf-8")
+        except OSError:
+            pass
 
-        self._written_bundles.add(bundle_rel)
+        self._written_bundles.add((self.output_dir, bundle_rel))
         return bundle_rel
 
-    def _extract_assets(self, content: str, asset_type: str) -> list[str]:
-        base_url_pattern = re.escape(Config.base_url) if Config.base_url else ""
-        if asset_type == "js":
-            pattern = re.compile(
-                rf'<script\s+(?!.*?data-no-bundle)[^>]*?src=["\'](?:{base_url_pattern})?(/js/[^":\' ]+)["\'][^>]*>\s*</script>',
-                re.IGNORECASE,
-            )
-        else:
-            pattern = re.compile(
-                rf'<link\s+(?!.*?data-no-bundle)[^>]*?href=["\'](?:{base_url_pattern})?(/css/[^":\' ]+)["\'][^>]*>',
-                re.IGNORECASE,
-            )
+    @staticmethod
+    def _build_source_stamp(asset_paths: list[Path]) -> str:
+        """Fingerprint bundle inputs by path, size and mtime (no reads)."""
+        parts = []
+        for asset_path in asset_paths:
+            stat = asset_path.stat()
+            parts.append(f"{asset_path}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.blake2b(
+            "|".join(parts).encode("utf-8"), digest_size=16
+        ).hexdigest()
 
-        seen: set[str] = set()
-        assets: list[str] = []
-        for match in pattern.finditer(content):
-            asset_rel = match.group(1)
-            if asset_rel not in seen:
-                seen.add(asset_rel)
-                assets.append(asset_rel)
-        return assets
-
-    def _replace_with_bundle(
-        self, content: str, asset_type: str, bundle_rel: str | None
-    ) -> str:
-        base_url_pattern = re.escape(Config.base_url) if Config.base_url else ""
-        if asset_type == "js":
-            pattern = re.compile(
-                rf'<script\s+(?!.*?data-no-bundle)[^>]*?src=["\'](?:{base_url_pattern})?(/js/[^":\' ]+)["\'][^>]*>\s*</script>',
-                re.IGNORECASE,
-            )
-        else:
-            pattern = re.compile(
-                rf'<link\s+(?!.*?data-no-bundle)[^>]*?href=["\'](?:{base_url_pattern})?(/css/[^":\' ]+)["\'][^>]*>',
-                re.IGNORECASE,
-            )
+    def execute(self, node: ContentNode, content: str) -> str:
+        scans: dict[str, list[re.Match[str]]] = {}
+        assets: dict[str, list[str]] = {}
+        for asset_type in ("js", "css"):
+            matches = list(_asset_pattern(asset_type).finditer(content))
+            if not matches:
+                continue
+
+            seen: set[str] = set()
+            ordered: list[str] = []
+            for match in matches:
+                asset_rel = match.group(1)
+                if asset_rel not in seen:
+                    seen.add(asset_rel)
+                    ordered.append(asset_rel)
 
-        if not bundle_rel:
+            scans[asset_type] = matches
+            assets[asset_type] = ordered
+
+        if not scans:
             return content
 
-        prefix = Config.base_url if Config.base_url else ""
-        if asset_type == "js":
-            replacement_tag = f'<script src="{prefix}/{bundle_rel}"></script>'
+        # The JS and CSS bundles are independent, so when both are present
+        # their minification work is interleaved across two threads.
+        if len(scans) == 2:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = {
+                    asset_type: pool.submit(
+                        self._write_bundle, asset_type, assets[asset_type]
+                    )
+                    for asset_type in scans
+                }
+                bundle_rels = {
+                    asset_type: future.result()
+                    for asset_type, future in futures.items()
+                }
         else:
-            replacement_tag = f'<link rel="stylesheet" href="{prefix}/{bundle_rel}">'
-
-        replacement_made = False
+            bundle_rels = {
+                asset_type: self._write_bundle(asset_type, assets[asset_type])
+                for asset_type in scans
+            }
 
-        def replacer(match: re.Match[str]) -> str:
-            nonlocal replacement_made
-            if replacement_made:
-                return ""
-            replacement_made = True
-            return replacement_tag
+        # Splice using the spans already found above: the first tag of each
+        # asset type becomes the bundle reference, the rest are dropped.
+        prefix = Config.base_url if Config.base_url else ""
+        replacements: list[tuple[int, int, str]] = []
+        for asset_type, matches in scans.items():
+            bundle_rel = bundle_rels[asset_type]
+            if not bundle_rel:
+                continue
 
-        return pattern.sub(replacer, content)
+            if asset_type == "js":
+                replacement_tag = f'<script src="{prefix}/{bundle_rel}"></script>'
+            else:
+                replacement_tag = f'<link rel="stylesheet" href="{prefix}/{bundle_rel}">'
 
-    def execute(self, node: ContentNode, content: str) -> str:
-        js_assets = self._extract_assets(content, "js")
-        css_assets = self._extract_assets(content, "css")
+            for index, match in enumerate(matches):
+                start, end = match.span()
+                replacements.append((start, end, replacement_tag if index == 0 else ""))
 
-        with self._lock:
-            js_bundle_rel = self._write_bundle("js", js_assets)
-            css_bundle_rel = self._write_bundle("css", css_assets)
+        if not replacements:
+            return content
 
-        new_content = self._replace_with_bundle(content, "js", js_bundle_rel)
-        new_content = self._replace_with_bundle(new_content, "css", css_bundle_rel)
-        return new_content
+        replacements.sort()
+        parts: list[str] = []
+        last_end = 0
+        for start, end, replacement in replacements:
+            parts.append(content[last_end:start])
+            parts.append(replacement)
+            last_end = end
+        parts.append(content[last_end:])
+        return "".join(parts)
@@ -1,3 +1,4 @@
+import hashlib
 import re
 from course_forge.domain.entities import ContentNode
 from .svg_processor_base import SVGProcessorBase
@@ -20,45 +21,110 @@ class ASTProcessor(SVGProcessorBase):
     """
     
     pattern = SVGProcessorBase.create_pattern("ast.plot", "")
-    
+
+    # In-process memo over identical DOT sources. The persistent cache is
+    # scoped by source path, so the same diagram reused across pages still
+    # misses it; this catches those repeats for the lifetime of the build.
+    _RENDER_MEMO: dict[str, bytes] = {}
+
     def execute(self, node: ContentNode, content: str) -> str:
+        if not self.has_block(content):
+            return content
+
         if not GRAPHVIZ_AVAILABLE:
             error_msg = '<div class="error">AST processor requires the graphviz package. Install with: pip install graphviz</div>'
-            matches = list(self.pattern.finditer(content))
-            for match in matches:
-                content = content.replace(match.group(0), error_msg)
-            return content
-        
+            return self.pattern.sub(lambda match: error_msg, content)
+
         matches = list(self.pattern.finditer(content))
         if not matches:
             return content
 
-        # Process from back to front to avoid position shifts during replacement
-        processed_content = content
-        for match in reversed(matches):
+        proc_name = self.__class__.__name__.lower().replace("processor", "")
+
+        # Pass 1: resolve cache hits and collect the DOT source of every block
+        # that still needs rendering, so all misses share one dot invocation.
+        svg_datas: list[bytes | None] = []
+        errors: list[str | None] = []
+        cache_files: list[str] = []
+        attrs_list: list[dict] = []
+        pending: list[int] = []
+        dot_codes: list[str] = []
+
+        for match in matches:
             ast_notation = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
-            
+            attrs_list.append(attrs)
+
+            cache_file = self._svg_cache_path(proc_name, match.group(0), node)
+            cache_files.append(cache_file)
+
+            cached = self._read_cached_svg(cache_file)
+            if cached is not None:
+                svg_datas.append(cached)
+                errors.append(None)
+                continue
+
+            svg_datas.append(None)
             try:
-                def render_ast(notation=ast_notation, attrs=attrs):
-                    # Use a stable prefix based on notation for this specific SVG's internal IDs
-                    prefix = "ast_" + hashlib.md5(notation.encode()).hexdigest()[:8]
-                    dot_code = self._convert_to_dot(
-                        notation,
-                        highlight_leftmost=attrs["leftmost"],
-                        highlight_rightmost=attrs["rightmost"],
-                        node_prefix=prefix
-                    )
-                    return self._render_graphviz(dot_code)
-                
-                proc_name = self.__class__.__name__.lower().replace("processor", "")
-                svg_data = self.get_cached_svg_or_render(
-                    proc_name,
-                    match.group(0),
-                    render_ast,
-                    node=node
+                # Use a stable prefix based on notation for this specific SVG's internal IDs
+                prefix = "ast_" + hashlib.md5(ast_notation.encode()).hexdigest()[:8]
+                dot_code = self._convert_to_dot(
+                    ast_notation,
+                    highlight_leftmost=attrs["leftmost"],
+                    highlight_rightmost=attrs["rightmost"],
+                    node_prefix=prefix
                 )
-                
+            except Exception as e:
+                errors.append(str(e))
+                continue
+
+            errors.append(None)
+
+            memoized = self._RENDER_MEMO.get(dot_code)
+            if memoized is not None:
+                self._write_cached_svg(cache_file, memoized)
+                svg_datas[-1] = memoized
+                continue
+
+            pending.append(len(svg_datas) - 1)
+            dot_codes.append(dot_code)
+
+        if pending:
+            try:
+                rendered = self._render_graphviz_batch(dot_codes)
+            except Exception:
+                rendered = None
+
+            if rendered is not None:
+                for index, dot_code, svg_data in zip(pending, dot_codes, rendered):
+                    self._RENDER_MEMO[dot_code] = svg_data
+                    self._write_cached_svg(cache_files[index], svg_data)
+                    svg_datas[index] = svg_data
+            else:
+                # Batched rendering failed (e.g. one malformed graph aborts the
+                # whole pipe); retry per diagram so only the bad block errors.
+                for index, dot_code in zip(pending, dot_codes):
+                    try:
+                        svg_data = self._render_graphviz(dot_code)
+                    except Exception as e:
+                        errors[index] = str(e)
+                        continue
+                    self._RENDER_MEMO[dot_code] = svg_data
+                    self._write_cached_svg(cache_files[index], svg_data)
+                    svg_datas[index] = svg_data
+
+        # Process from back to front to avoid position shifts during replacement
+        processed_content = content
+        for match, attrs, svg_data, error in zip(
+            reversed(matches),
+            reversed(attrs_list),
+            reversed(svg_datas),
+            reversed(errors),
+        ):
+            try:
+                if svg_data is None:
+                    raise ValueError(error or "Failed to render AST diagram")
+
                 svg_html = self.generate_inline_svg(
                     svg_data,
                     attrs["width"],
@@ -67,16 +133,14 @@ class ASTProcessor(SVGProcessorBase):
                     attrs["sketch"],
                     css_class="svg-graph ast-plot-img",
                 )
-                svg_html = f'<div class="no-break">{svg_html}</div>'
-                
-                # Replace only this specific match occurrence
-                start, end = match.span()
-                processed_content = processed_content[:start] + svg_html + processed_content[end:]
+                replacement = f'<div class="no-break">{svg_html}</div>'
             except Exception as e:
-                error_msg = f'<div class="error">AST error: {str(e)}</div>'
-                start, end = match.span()
-                processed_content = processed_content[:start] + error_msg + processed_content[end:]
-        
+                replacement = f'<div class="error">AST error: {str(e)}</div>'
+
+            # Replace only this specific match occurrence
+            start, end = match.span()
+            processed_content = processed_content[:start] + replacement + processed_content[end:]
+
         return processed_content
     
     def _convert_to_dot(
@@ -180,63 +244,52 @@ class ASTProcessor(SVGProcessorBase):
         
         return "\n".join(dot_lines)
     
+    _TOKEN_PATTERN = re.compile(r"[()]|[^()\s]+")
+
     def _tokenize(self, notation: str) -> list:
         """Tokenize the input notation."""
-        # Remove extra whitespace and split by spaces, preserving parentheses
-        notation = notation.strip()
-        tokens = []
-        current_token = ""
-        
-        for char in notation:
-            if char in "()":
-                if current_token:
-                    tokens.append(current_token)
-                    current_token = ""
-                tokens.append(char)
-            elif char.isspace():
-                if current_token:
-                    tokens.append(current_token)
-                    current_token = ""
-            else:
-                current_token += char
-        
-        if current_token:
-            tokens.append(current_token)
-        
-        return tokens
-    
+        # Parentheses and whitespace-delimited atoms in a single regex scan
+        return self._TOKEN_PATTERN.findall(notation)
+
     def _parse_tokens(self, tokens: list, index: int) -> tuple:
         """Parse tokens into tree structure. Returns (node, next_index)."""
         if index >= len(tokens):
             raise ValueError("Unexpected end of input")
-        
+
         token = tokens[index]
-        
-        if token == "(":
-            # This is a branch node (operator)
-            index += 1
-            if index >= len(tokens):
-                raise ValueError("Expected operator after '('")
-            
-            operator = tokens[index]
-            index += 1
-            
-            children = []
-            while index < len(tokens) and tokens[index] != ")":
-                child, index = self._parse_tokens(tokens, index)
-                children.append(child)
-            
-            if index >= len(tokens):
-                raise ValueError("Expected ')' to close expression")
-            
-            index += 1  # Skip the ')'
-            
-            return {"type": "operator", "value": operator, "children": children}, index
-        elif token == ")":
+
+        if token == ")":
             raise ValueError("Unexpected ')'")
-        else:
+
+        if token != "(":
             # This is a leaf node
             return {"type": "leaf", "value": token}, index + 1
+
+        # Branch nodes are parsed iteratively with an explicit stack of open
+        # operator nodes, avoiding recursion depth limits on deep expressions
+        stack: list[dict] = []
+
+        while index < len(tokens):
+            token = tokens[index]
+
+            if token == "(":
+                index += 1
+                if index >= len(tokens):
+                    raise ValueError("Expected operator after '('")
+                node = {"type": "operator", "value": tokens[index], "children": []}
+                index += 1
+                stack.append(node)
+            elif token == ")":
+                node = stack.pop()
+                index += 1
+                if not stack:
+                    return node, index
+                stack[-1]["children"].append(node)
+            else:
+                stack[-1]["children"].append({"type": "leaf", "value": token})
+                index += 1
+
+        raise ValueError("Expected ')' to close expression")
     
     def _collect_operators(self, node: dict, operators: list, node_id: str, counter: list, prefix: str):
         """Collect all operator nodes."""
@@ -294,7 +347,7 @@ class ASTProcessor(SVGProcessorBase):
         """Render DOT code to SVG using Graphviz."""
         src = graphviz.Source(dot_code, format='svg')
         svg_str = src.pipe(format='svg').decode('utf-8')
-        
+
         # Extract just the SVG element
         svg_match = re.search(r'(<svg[^>]*>.*?</svg>)', svg_str, re.DOTALL)
         if svg_match:
@@ -302,3 +355,21 @@ class ASTProcessor(SVGProcessorBase):
             return svg_content.encode('utf-8')
         else:
             raise ValueError("Failed to extract SVG from Graphviz output")
+
+    def _render_graphviz_batch(self, dot_codes: list[str]) -> list[bytes]:
+        """Render several DOT graphs with a single dot invocation.
+
+        dot accepts multiple graphs on stdin and emits one SVG document per
+        graph, so batching amortizes the subprocess startup cost across all
+        diagrams of a page.
+        """
+        if len(dot_codes) == 1:
+            return [self._render_graphviz(dot_codes[0])]
+
+        src = graphviz.Source("\n".join(dot_codes), format='svg')
+        svg_str = src.pipe(format='svg').decode('utf-8')
+
+        svgs = re.findall(r'(<svg[^>]*>.*?</svg>)', svg_str, re.DOTALL)
+        if len(svgs) != len(dot_codes):
+            raise ValueError("Failed to extract SVGs from batched Graphviz output")
+        return [svg.encode('utf-8') for svg in svgs]
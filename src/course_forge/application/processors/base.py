@@ -4,5 +4,9 @@ from course_forge.domain.entities import ContentNode
 
 
 class Processor(ABC):
+    # Empty slots so subclasses can opt into __slots__ layouts; subclasses
+    # that do not declare __slots__ keep their __dict__ as before.
+    __slots__ = ()
+
     @abstractmethod
     def execute(self, node: ContentNode, content: str) -> str: ...
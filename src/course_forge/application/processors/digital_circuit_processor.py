@@ -1,19 +1,41 @@
 from typing import Optional
 import re
+import schemdraw
+import schemdraw.elements as elm
 from schemdraw.parsing.logic_parser import logicparse
+import matplotlib
+import matplotlib.pyplot as plt
 
 from course_forge.domain.entities import ContentNode
 
 from .svg_processor_base import SVGProcessorBase
 
+# One-time matplotlib setup: non-interactive backend, transparent SVG output
+# with text elements. Previously re-applied inside every _render_circuit call.
+matplotlib.use("Agg")
+plt.rcParams["savefig.transparent"] = True
+plt.rcParams["svg.fonttype"] = "none"
+
 
 class DigitalCircuitProcessor(SVGProcessorBase):
     pattern = SVGProcessorBase.create_pattern("digital-circuit.plot", "")
 
+    # In-process memo keyed by render inputs. The persistent cache is scoped
+    # by source path, so identical circuits reused across pages still miss
+    # it; this catches those repeats for the lifetime of the build.
+    _RENDER_MEMO: dict[tuple[str, Optional[str], bool], bytes] = {}
+
     def execute(self, node: ContentNode, content: str) -> str:
-        matches = list(self.pattern.finditer(content))
+        if not self.has_block(content):
+            return content
+
+        # Rebuild the document in one pass over the match spans instead of
+        # calling content.replace per match, which rescans and copies the
+        # whole string every time (and substitutes duplicate blocks at once).
+        parts: list[str] = []
+        last_end = 0
 
-        for match in matches:
+        for match in self.pattern.finditer(content):
             full_content = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
             svg_htmls = []
@@ -108,29 +130,34 @@ class DigitalCircuitProcessor(SVGProcessorBase):
                 # Wrap in no-break div for print layout
                 svg_htmls.append(f'<div class="no-break">{svg_html}</div>')
 
-            content = content.replace(match.group(0), "\n".join(svg_htmls))
+            parts.append(content[last_end:match.start()])
+            parts.append("\n".join(svg_htmls))
+            last_end = match.end()
 
-        return content
+        if not parts:
+            return content
+
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _render_circuit(
         self, expr: str, outlabel: Optional[str], is_identity: bool = False
     ) -> bytes:
+        memo_key = (expr, outlabel, is_identity)
+        memoized = self._RENDER_MEMO.get(memo_key)
+        if memoized is not None:
+            return memoized
+
         with self._MATPLOTLIB_RENDER_LOCK:
-            # Configure matplotlib for SVG output (similar to schemdraw processor)
+            # Reassert the matplotlib backend per render: KarnaughMapProcessor
+            # switches the global schemdraw backend to "svg", so this cannot
+            # be hoisted to module scope.
             try:
-                import schemdraw
-
                 schemdraw.use("matplotlib")
-                import matplotlib.pyplot as plt
-
-                plt.rcParams["savefig.transparent"] = True
-                plt.rcParams["svg.fonttype"] = "none"
-            except ImportError:
+            except Exception:
                 pass
 
             if is_identity:
-                import schemdraw.elements as elm
-
                 d = schemdraw.Drawing()
                 d += elm.Line().length(1.5).label(expr, "left").label(outlabel, "right")
             else:
@@ -140,10 +167,9 @@ class DigitalCircuitProcessor(SVGProcessorBase):
 
             # Explicitly close all figures to prevent warnings.
             try:
-                import matplotlib.pyplot as plt
-
                 plt.close("all")
             except Exception:
                 pass
 
+        self._RENDER_MEMO[memo_key] = svg_data
         return svg_data
@@ -20,18 +20,19 @@ class GraphvizProcessor(SVGProcessorBase):
     pattern = SVGProcessorBase.create_pattern("graphviz.plot", "")
 
     def execute(self, node: ContentNode, content: str) -> str:
+        if not self.has_block(content):
+            return content
+
         if not GRAPHVIZ_AVAILABLE:
             error_msg = '<div class="error">Graphviz processor requires the graphviz package. Install with: pip install graphviz</div>'
-            return content.replace(
-                self.pattern.search(content).group(0)
-                if self.pattern.search(content)
-                else "",
-                error_msg,
-            )
+            return self.pattern.sub(lambda match: error_msg, content)
 
-        matches = list(self.pattern.finditer(content))
+        # Rebuild the document in one pass over the match spans instead of
+        # rescanning and copying the whole string with content.replace.
+        parts: list[str] = []
+        last_end = 0
 
-        for match in matches:
+        for match in self.pattern.finditer(content):
             dot_code = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
 
@@ -56,13 +57,19 @@ class GraphvizProcessor(SVGProcessorBase):
                     id_prefix=self.build_svg_id_prefix(proc_name, match.group(0), node),
                 )
                 outer_classes = "no-break centered" if attrs["centered"] else "no-break"
-                svg_html = f'<div class="{outer_classes}">{svg_html}</div>'
-                content = content.replace(match.group(0), svg_html)
+                replacement = f'<div class="{outer_classes}">{svg_html}</div>'
             except Exception as e:
-                error_msg = f'<div class="error">Graphviz error: {str(e)}</div>'
-                content = content.replace(match.group(0), error_msg)
+                replacement = f'<div class="error">Graphviz error: {str(e)}</div>'
+
+            parts.append(content[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if not parts:
+            return content
 
-        return content
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _render_graphviz(self, dot_code: str, attrs: dict) -> bytes:
         """Render DOT notation to SVG using Graphviz."""
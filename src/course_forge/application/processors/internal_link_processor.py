@@ -1,5 +1,6 @@
 import os
 import re
+from functools import partial
 from urllib.parse import quote
 
 from course_forge.domain.entities import ContentNode
@@ -24,46 +25,75 @@ class InternalLinkProcessor(Processor):
         re.MULTILINE,
     )
 
+    # Characters quote() would leave untouched in a path; hrefs made only of
+    # these can skip encoding entirely.
+    _SAFE_PATH_CHARS = frozenset(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789/-._~"
+    )
+
     def __init__(self) -> None:
         self.root: ContentNode | None = None
+        # Sibling pages link the same targets repeatedly; resolution results
+        # are cached per (starting node, href) for the lifetime of one tree.
+        self._resolve_cache: dict[tuple[int, str], ContentNode | None] = {}
+        self._abs_slugs: dict[int, tuple[str, ...]] = {}
+        self._child_index: dict[int, dict[str, ContentNode]] = {}
 
     def set_root(self, root: ContentNode) -> None:
         self.root = root
+        self._resolve_cache.clear()
+        self._child_index.clear()
+        # Precompute every node's absolute slug path up front. slug and
+        # slugs_path are computed properties (unicode normalization plus two
+        # regexes per ancestor), so rebuilding these lists per link is costly.
+        abs_slugs: dict[int, tuple[str, ...]] = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            abs_slugs[id(node)] = tuple(node.slugs_path) + (node.slug,)
+            stack.extend(node.children)
+        self._abs_slugs = abs_slugs
 
     def execute(self, node: ContentNode, content: str) -> str:
-        def replace_link(match: re.Match) -> str:
-            text = match.group(1)
-            href = match.group(2)
+        # Fast-path reject: no markdown link syntax means nothing to rewrite
+        if "](" not in content:
+            return content
+
+        # partial keeps node out of shared state: execute runs concurrently
+        # across pages under build_site's thread pool, so stashing the node
+        # on self would race.
+        return self.LINK_PATTERN.sub(partial(self._replace_link, node), content)
 
-            if self._is_external_link(href):
-                return match.group(0)
+    def _replace_link(self, node: ContentNode, match: re.Match) -> str:
+        text = match.group(1)
+        href = match.group(2)
 
-            if href.startswith("#"):
-                return match.group(0)
+        if self._is_external_link(href):
+            return match.group(0)
 
-            # Try to resolve node if we have the tree
-            if self.root:
-                resolved_href = self._resolve_link(node, href)
-                if resolved_href:
-                    return f"[{text}]({resolved_href})"
+        if href.startswith("#"):
+            return match.group(0)
 
-            # Fallback to simple replacement
-            if href.endswith(".md"):
-                href = href[:-3] + ".html"
-            elif not self._has_extension(href) and not href.endswith("/"):
-                href = href + ".html"
+        # Try to resolve node if we have the tree
+        if self.root:
+            resolved_href = self._resolve_link(node, href)
+            if resolved_href:
+                return f"[{text}]({resolved_href})"
 
-            href = self._encode_path(href)
+        # Fallback to simple replacement
+        if href.endswith(".md"):
+            href = href[:-3] + ".html"
+        elif not self._has_extension(href) and not href.endswith("/"):
+            href = href + ".html"
 
-            return f"[{text}]({href})"
+        href = self._encode_path(href)
 
-        return self.LINK_PATTERN.sub(replace_link, content)
+        return f"[{text}]({href})"
 
     def _resolve_link(self, current_node: ContentNode, href: str) -> str | None:
         """Resolve a relative or absolute path to a ContentNode and return its slug path."""
         # Clean up href
-        path_part = href.split("#")[0]
-        anchor = href.split("#")[1] if "#" in href else ""
+        path_part, _, anchor = href.partition("#")
 
         if path_part.startswith("/"):
             # Absolute path from root
@@ -73,10 +103,10 @@ class InternalLinkProcessor(Processor):
             target_node = self._resolve_relative_path(current_node, path_part)
 
         if target_node:
-            slugs = target_node.slugs_path + [target_node.slug]
+            slugs = self._node_slugs(target_node)
 
             # Construct relative path from current_node to target_node
-            current_slugs = current_node.slugs_path + [current_node.slug]
+            current_slugs = self._node_slugs(current_node)
 
             if current_node.is_file:
                 current_dir_slugs = current_slugs[:-1]
@@ -100,12 +130,46 @@ class InternalLinkProcessor(Processor):
 
         return None
 
+    def _get_child_index(self, node: ContentNode) -> dict[str, ContentNode]:
+        """Return a cached lookup of children by src basename and name.
+
+        setdefault keeps the first child registered for a key, matching the
+        linear scan this replaces, which also preferred earlier siblings.
+        """
+        index = self._child_index.get(id(node))
+        if index is None:
+            index = {}
+            for child in node.children:
+                index.setdefault(os.path.basename(child.src_path), child)
+                index.setdefault(child.name, child)
+            self._child_index[id(node)] = index
+        return index
+
+    def _node_slugs(self, node: ContentNode) -> tuple[str, ...]:
+        """Return the precomputed absolute slug path for a node."""
+        cached = self._abs_slugs.get(id(node))
+        if cached is None:
+            cached = tuple(node.slugs_path) + (node.slug,)
+            self._abs_slugs[id(node)] = cached
+        return cached
+
     def _find_node_by_path(self, root: ContentNode, path: str) -> ContentNode | None:
         # Implementation relying on relative resolution for now
         return None  # To be implemented if we need absolute path support
 
     def _resolve_relative_path(
         self, current_node: ContentNode, href: str
+    ) -> ContentNode | None:
+        key = (id(current_node), href)
+        if key in self._resolve_cache:
+            return self._resolve_cache[key]
+
+        resolved = self._walk_relative_path(current_node, href)
+        self._resolve_cache[key] = resolved
+        return resolved
+
+    def _walk_relative_path(
+        self, current_node: ContentNode, href: str
     ) -> ContentNode | None:
         if current_node.is_file:
             current_dir = current_node.parent
@@ -125,16 +189,7 @@ class InternalLinkProcessor(Processor):
                 if node.parent:
                     node = node.parent
             else:
-                found = None
-                for child in node.children:
-                    # Check against original filename/path basename
-                    if os.path.basename(child.src_path) == part:
-                        found = child
-                        break
-                    # Fallback to name check
-                    if child.name == part:
-                        found = child
-                        break
+                found = self._get_child_index(node).get(part)
 
                 if found:
                     node = found
@@ -144,7 +199,7 @@ class InternalLinkProcessor(Processor):
         return node
 
     def _compute_relative_slug_path(
-        self, start_slugs: list[str], target_slugs: list[str]
+        self, start_slugs: tuple[str, ...], target_slugs: tuple[str, ...]
     ) -> str:
         # Find common prefix
         i = 0
@@ -161,22 +216,27 @@ class InternalLinkProcessor(Processor):
         # Steps down
         down_steps = target_slugs[i:]
 
-        path_parts = [".."] * up_steps + down_steps
+        path_parts = [".."] * up_steps
+        path_parts.extend(down_steps)
         if not path_parts:
             return "."  # Same directory?
 
         return "/".join(path_parts)
 
     def _is_external_link(self, href: str) -> bool:
-        return href.startswith(("http://", "https://", "mailto:", "tel:"))
+        # Almost every internal href fails on the first character, so the
+        # four-prefix scan only runs for hrefs that could be external.
+        return href[:1] in "hmt" and href.startswith(
+            ("http://", "https://", "mailto:", "tel:")
+        )
 
     def _has_extension(self, href: str) -> bool:
-        path = href.split("#")[0].split("?")[0]
-        last_part = path.split("/")[-1]
-        return "." in last_part
+        path = href.partition("#")[0].partition("?")[0]
+        return "." in path.rpartition("/")[2]
 
     def _encode_path(self, href: str) -> str:
         """URL-encode spaces and special chars in path, preserving structure."""
-        parts = href.split("/")
-        encoded_parts = [quote(part, safe="") for part in parts]
-        return "/".join(encoded_parts)
+        if all(c in self._SAFE_PATH_CHARS for c in href):
+            return href
+        # Keeping "/" safe is equivalent to quoting each segment separately.
+        return quote(href, safe="/")
@@ -1,10 +1,31 @@
 import re
+from operator import itemgetter
+
 import schemdraw
 from schemdraw import logic, Drawing
 import itertools
 from course_forge.domain.entities import ContentNode
 from .svg_processor_base import SVGProcessorBase
 
+# Group palette (Border Color [Medium Pastel], Fill Color [Light Pastel]),
+# shared by every group line instead of being rebuilt per group.
+_PALETTE = {
+    "red": {"color": "#ff9999", "fill": "#ffcccc"},
+    "blue": {"color": "#9999ff", "fill": "#ccccff"},
+    "green": {"color": "#99ff99", "fill": "#ccffcc"},
+    "yellow": {"color": "#e6e600", "fill": "#ffffcc"},
+    "orange": {"color": "#ffcc99", "fill": "#ffebcc"},
+    "purple": {"color": "#cc99ff", "fill": "#e6ccff"},
+    "cyan": {"color": "#99ffff", "fill": "#ccffff"},
+    "magenta": {"color": "#ff99ff", "fill": "#ffccff"},
+    "teal": {"color": "#99ffcc", "fill": "#ccffeb"},
+    "pink": {"color": "#ff99cc", "fill": "#ffccdd"},
+    "lime": {"color": "#99ff99", "fill": "#e6ffcc"},
+    "indigo": {"color": "#9999ff", "fill": "#ccccff"},
+    "violet": {"color": "#cc99ff", "fill": "#f2ccff"},
+    "gray": {"color": "#b3b3b3", "fill": "#e0e0e0"},
+}
+
 
 class KarnaughMapProcessor(SVGProcessorBase):
     """Processor for Karnaugh Maps (K-Map).
@@ -20,10 +41,21 @@ class KarnaughMapProcessor(SVGProcessorBase):
 
     pattern = SVGProcessorBase.create_pattern("karnaugh.map", "")
 
+    # In-process memo keyed by the canonicalized config. The persistent cache
+    # is scoped by source path, so the same reference K-map repeated across
+    # lessons still misses it; this skips the matplotlib boot for repeats.
+    _RENDER_MEMO: dict[tuple, bytes] = {}
+
     def execute(self, node: ContentNode, content: str) -> str:
-        matches = list(self.pattern.finditer(content))
+        if not self.has_block(content):
+            return content
+
+        # Rebuild the document in one pass over the match spans instead of
+        # rescanning and copying the whole string with content.replace.
+        parts: list[str] = []
+        last_end = 0
 
-        for match in matches:
+        for match in self.pattern.finditer(content):
             code = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
 
@@ -45,13 +77,19 @@ class KarnaughMapProcessor(SVGProcessorBase):
                     attrs["sketch"],
                     css_class="svg-graph kmap-img",
                 )
-                svg_html = f'<div class="no-break">{svg_html}</div>'
-                content = content.replace(match.group(0), svg_html)
+                replacement = f'<div class="no-break">{svg_html}</div>'
             except Exception as e:
-                error_msg = f'<div class="error">K-Map error: {str(e)}</div>'
-                content = content.replace(match.group(0), error_msg)
+                replacement = f'<div class="error">K-Map error: {str(e)}</div>'
 
-        return content
+            parts.append(content[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if not parts:
+            return content
+
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _parse_config(self, code: str) -> dict:
         config = {
@@ -62,9 +100,12 @@ class KarnaughMapProcessor(SVGProcessorBase):
             "truthtable": [],
         }
 
-        lines = code.strip().split("\n")
+        # Phase 1: Read raw values. Lines are stripped exactly once up front;
+        # the old loop re-stripped block-terminating lines in the inner grid
+        # and groups scans and tested each directive with its own startswith.
+        stripped = [line.strip() for line in code.strip().split("\n")]
+        n_lines = len(stripped)
 
-        # Phase 1: Read raw values
         raw_values = {
             "names": "",
             "grid_lines": [],
@@ -73,46 +114,42 @@ class KarnaughMapProcessor(SVGProcessorBase):
         }
 
         i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line or line.startswith("#"):
+        while i < n_lines:
+            line = stripped[i]
+            if not line or line[0] == "#":
                 i += 1
                 continue
 
-            if line.startswith("grid:"):
+            head, sep, value = line.partition(":")
+
+            if sep and head == "grid":
                 i += 1
-                while i < len(lines):
-                    gline = lines[i].strip()
-                    if ":" in gline and not gline.startswith("#"):
+                while i < n_lines:
+                    gline = stripped[i]
+                    if ":" in gline and gline[0] != "#":
                         break
-                    if gline and not gline.startswith("#"):
+                    if gline and gline[0] != "#":
                         raw_values["grid_lines"].append(gline)
                     i += 1
                 continue
 
-            if line.startswith("groups:"):
+            if sep and head == "groups":
                 i += 1
-                while i < len(lines):
-                    gline = lines[i].strip()
-                    if not gline or gline.startswith("#"):
+                while i < n_lines:
+                    gline = stripped[i]
+                    if not gline or gline[0] == "#":
                         i += 1
                         continue
 
-                    if ":" in gline and not (
-                        gline.startswith("-")
-                        or gline.startswith("'")
-                        or gline.startswith('"')
-                    ):
-                        if not gline.startswith("-"):
-                            break
+                    if ":" in gline and gline[0] not in "-'\"":
+                        break
 
                     raw_values["groups"].append(gline)
                     i += 1
                 continue
 
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip().lower()
+            if sep:
+                key = head.strip().lower()
                 value = value.strip()
 
                 if key == "names":
@@ -166,6 +203,9 @@ class KarnaughMapProcessor(SVGProcessorBase):
             num_vars, raw_values["grid_lines"]
         )
 
+        # C-level bulk extraction shared by every cell of every group line.
+        permuter = itemgetter(*permute_indices)
+
         # Parse Groups with Permutation
         for gline in raw_values["groups"]:
             # Parse line (same logic as before)
@@ -183,28 +223,9 @@ class KarnaughMapProcessor(SVGProcessorBase):
 
                 # Auto-styling: Enhanced Palette
                 if "color" in params:
-                    raw_color = params["color"].lower()
-
-                    # Define Palette (Border Color [Medium Pastel], Fill Color [Light Pastel])
-                    palette = {
-                        "red": {"color": "#ff9999", "fill": "#ffcccc"},
-                        "blue": {"color": "#9999ff", "fill": "#ccccff"},
-                        "green": {"color": "#99ff99", "fill": "#ccffcc"},
-                        "yellow": {"color": "#e6e600", "fill": "#ffffcc"},
-                        "orange": {"color": "#ffcc99", "fill": "#ffebcc"},
-                        "purple": {"color": "#cc99ff", "fill": "#e6ccff"},
-                        "cyan": {"color": "#99ffff", "fill": "#ccffff"},
-                        "magenta": {"color": "#ff99ff", "fill": "#ffccff"},
-                        "teal": {"color": "#99ffcc", "fill": "#ccffeb"},
-                        "pink": {"color": "#ff99cc", "fill": "#ffccdd"},
-                        "lime": {"color": "#99ff99", "fill": "#e6ffcc"},
-                        "indigo": {"color": "#9999ff", "fill": "#ccccff"},
-                        "violet": {"color": "#cc99ff", "fill": "#f2ccff"},
-                        "gray": {"color": "#b3b3b3", "fill": "#e0e0e0"},
-                    }
-
-                    if raw_color in palette:
-                        style = palette[raw_color]
+                    style = _PALETTE.get(params["color"].lower())
+
+                    if style is not None:
                         # Apply border color
                         params["color"] = style["color"]
 
@@ -228,8 +249,7 @@ class KarnaughMapProcessor(SVGProcessorBase):
                     # Could warn/skip. Skipping invalid pattern.
                     continue
                 # Permute
-                new_cell = "".join([cell[i] for i in permute_indices])
-                permuted_cells.append(new_cell)
+                permuted_cells.append("".join(permuter(cell)))
 
             if permuted_cells:
                 pattern = self._derive_pattern(permuted_cells)
@@ -296,17 +316,30 @@ class KarnaughMapProcessor(SVGProcessorBase):
         if any(len(c) != n for c in cells):
             return None
 
-        pattern = []
-        for i in range(n):
-            bits = set(c[i] for c in cells)
-            if len(bits) == 1:
-                pattern.append(bits.pop())
-            else:
-                pattern.append(".")
+        # Reduce columns against the first cell directly instead of building
+        # one set per column; cells only contain '0'/'1', so a column once
+        # wildcarded stays wildcarded.
+        pattern = list(cells[0])
+        for cell in cells[1:]:
+            for i, bit in enumerate(cell):
+                if pattern[i] != bit:
+                    pattern[i] = "."
 
         return "".join(pattern)
 
     def _render_kmap(self, config: dict) -> bytes:
+        memo_key = (
+            config["schemdraw_names"],
+            tuple(config["truthtable"]),
+            tuple(
+                (cells, tuple(sorted(params.items())))
+                for cells, params in sorted(config["groups"].items())
+            ),
+        )
+        memoized = self._RENDER_MEMO.get(memo_key)
+        if memoized is not None:
+            return memoized
+
         with self._MATPLOTLIB_RENDER_LOCK:
             try:
                 schemdraw.use("svg")
@@ -337,13 +370,10 @@ class KarnaughMapProcessor(SVGProcessorBase):
             except Exception:
                 pass
 
-        # Inject custom class to allow CSS exclusion
-        try:
-            svg_str = svg_bytes.decode("utf-8")
-            if "<svg " in svg_str:
-                svg_str = svg_str.replace("<svg ", '<svg class="kmap-graph" ', 1)
-                return svg_str.encode("utf-8")
-        except Exception:
-            pass
+        # Inject custom class to allow CSS exclusion; operating on the raw
+        # bytes skips the decode/encode round-trip over the whole blob.
+        if b"<svg " in svg_bytes:
+            svg_bytes = svg_bytes.replace(b"<svg ", b'<svg class="kmap-graph" ', 1)
 
+        self._RENDER_MEMO[memo_key] = svg_bytes
         return svg_bytes
@@ -28,9 +28,15 @@ class MatplotlibProcessor(SVGProcessorBase):
     def _process_pattern(
         self, node: ContentNode, content: str, pattern: re.Pattern
     ) -> str:
-        matches = list(pattern.finditer(content))
+        if not self.has_block(content, pattern):
+            return content
 
-        for match in matches:
+        # Rebuild the document in one pass over the match spans instead of
+        # rescanning and copying the whole string with content.replace.
+        parts: list[str] = []
+        last_end = 0
+
+        for match in pattern.finditer(content):
             code = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
 
@@ -52,14 +58,19 @@ class MatplotlibProcessor(SVGProcessorBase):
 
                 # Keep the outer wrapper aligned with the requested layout.
                 outer_classes = "no-break centered" if attrs["centered"] else "no-break"
-                svg_html = f'<div class="{outer_classes}">{svg_html}</div>'
-
-                content = content.replace(match.group(0), svg_html)
+                replacement = f'<div class="{outer_classes}">{svg_html}</div>'
             except Exception as e:
-                error_msg = f'<div class="error">Matplotlib error: {str(e)}</div>'
-                content = content.replace(match.group(0), error_msg)
+                replacement = f'<div class="error">Matplotlib error: {str(e)}</div>'
 
-        return content
+            parts.append(content[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if not parts:
+            return content
+
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _render_plot(self, code: str) -> bytes:
         """Execute matplotlib code and return SVG bytes."""
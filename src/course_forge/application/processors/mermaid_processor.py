@@ -20,6 +20,9 @@ class MermaidProcessor(SVGProcessorBase):
     pattern = SVGProcessorBase.create_pattern("mermaid.plot", "")
     
     def execute(self, node: ContentNode, content: str) -> str:
+        if not self.has_block(content):
+            return content
+
         def replace_mermaid(match: re.Match) -> str:
             indent = match.group("indent")
             
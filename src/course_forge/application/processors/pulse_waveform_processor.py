@@ -1,3 +1,4 @@
+import heapq
 import re
 from course_forge.domain.entities import ContentNode
 from .svg_processor_base import SVGProcessorBase
@@ -22,8 +23,28 @@ class PulseWaveformProcessor(SVGProcessorBase):
     Example: `---...` = 3 units high, 3 units low
     """
 
+    __slots__ = ()
+
     pattern = SVGProcessorBase.create_pattern("pulse.waveform", "")
 
+    # Tokenizes a pulse string into runs of high/low states and tick markers
+    # in one C-level scan; any other character is skipped, as before.
+    _PULSE_TOKEN = re.compile(r"(-+)|(\.+)|(\|)")
+
+    # Directive keys that never name a channel.
+    _RESERVED_KEYS = frozenset(
+        {"y-axis", "x-axis", "pulses", "width", "height", "centered", "ticks", "grid"}
+    )
+
+    # Single-pass XML escape table; replaces five chained str.replace calls.
+    _XML_ESC = str.maketrans({
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "'": "&#39;",
+    })
+
     # Dimensions
     PULSE_HEIGHT = 40
     UNIT_WIDTH = 10
@@ -43,36 +64,92 @@ class PulseWaveformProcessor(SVGProcessorBase):
     GRID_COLOR = "#333"
     ZEBRA_COLOR = "#333"
 
+    # The arrowhead defs only depend on the class constants above, so the
+    # block is assembled once here instead of per rendered SVG.
+    _DEFS_BLOCK = (
+        '<defs>'
+        f'  <marker id="arrowhead" markerWidth="{ARROW_SIZE}" markerHeight="{ARROW_SIZE}" refX="{ARROW_SIZE-1}" refY="{ARROW_SIZE/2}" orient="auto">'
+        f'    <polygon points="0 0, {ARROW_SIZE} {ARROW_SIZE/2}, 0 {ARROW_SIZE}" fill="{AXIS_COLOR}" stroke="none"/>'
+        '  </marker>'
+        '</defs>'
+    )
+
+    # Attribute tails built from the class constants above, assembled once
+    # instead of re-interpolated for every emitted element.
+    _PATH_ATTRS = (
+        f'fill="none" stroke="{PULSE_COLOR}" stroke-width="2.5" '
+        'stroke-linecap="round" stroke-linejoin="round"'
+    )
+    _AXIS_LINE_ATTRS = (
+        f'stroke="{AXIS_COLOR}" stroke-width="1.5" marker-end="url(#arrowhead)"'
+    )
+    _AXIS_LINE_PLAIN_ATTRS = f'stroke="{AXIS_COLOR}" stroke-width="1.5"'
+    _TICK_ATTRS = f'stroke="{AXIS_COLOR}" stroke-width="1.5"'
+    _GRID_LINE_ATTRS = f'stroke="{GRID_COLOR}" stroke-width="1" stroke-dasharray="2,2"'
+
+    # The rendered markup is a pure function of the block source and its
+    # attributes, so blocks repeated across pages reuse the final HTML
+    # without re-parsing or re-rendering.
+    _HTML_MEMO: dict[tuple, str] = {}
+
+    # Parsed pulse strings, shared across blocks: clock-style channels repeat
+    # the same signal definitions throughout a course. Entries are tuples so
+    # the cached value can be handed out without defensive copies.
+    _PULSE_MEMO: dict[str, tuple] = {}
+
     def execute(self, node: ContentNode, content: str) -> str:
-        matches = list(self.pattern.finditer(content))
+        if not self.has_block(content):
+            return content
+
+        # Rebuild the document in one pass over the match spans instead of
+        # rescanning and copying the whole string with content.replace.
+        parts: list[str] = []
+        last_end = 0
 
-        for match in matches:
+        for match in self.pattern.finditer(content):
             code = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
 
-            try:
-                config = self._parse_waveform_config(code)
-                
-                if "channels" in config and config["channels"]:
-                     svg_data = self._render_group_waveform(config)
-                else:
-                     svg_data = self._render_single_waveform(config)
-                
-                svg_html = self.generate_inline_svg(
-                    svg_data,
-                    attrs["width"],
-                    attrs["height"],
-                    attrs["centered"],
-                    attrs["sketch"],
-                    css_class="svg-graph pulse-waveform-img",
-                )
-                svg_html = f'<div class="no-break">{svg_html}</div>'
-                content = content.replace(match.group(0), svg_html)
-            except Exception as e:
-                error_msg = f'<div class="error">Pulse waveform error: {str(e)}</div>'
-                content = content.replace(match.group(0), error_msg)
-
-        return content
+            memo_key = (
+                code,
+                attrs["width"],
+                attrs["height"],
+                attrs["centered"],
+                attrs["sketch"],
+            )
+            replacement = self._HTML_MEMO.get(memo_key)
+
+            if replacement is None:
+                try:
+                    config = self._parse_waveform_config(code)
+
+                    if "channels" in config and config["channels"]:
+                        svg_data = self._render_group_waveform(config)
+                    else:
+                        svg_data = self._render_single_waveform(config)
+
+                    svg_html = self.generate_inline_svg(
+                        svg_data,
+                        attrs["width"],
+                        attrs["height"],
+                        attrs["centered"],
+                        attrs["sketch"],
+                        css_class="svg-graph pulse-waveform-img",
+                    )
+                    replacement = f'<div class="no-break">{svg_html}</div>'
+                    self._HTML_MEMO[memo_key] = replacement
+                except Exception as e:
+                    replacement = f'<div class="error">Pulse waveform error: {str(e)}</div>'
+
+            parts.append(content[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if not parts:
+            return content
+
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _parse_waveform_config(self, code: str) -> dict:
         """Parse the declarative waveform configuration."""
@@ -89,28 +166,32 @@ class PulseWaveformProcessor(SVGProcessorBase):
         
         has_group_channels = False
         
+        # Each line is partitioned once and dispatched on the raw key, which
+        # matches the former startswith("<key>:") prefix tests exactly.
         for line in code.strip().split("\n"):
             line = line.strip()
-            if not line or line.startswith("#"):
+            if not line or line[0] == "#":
                 continue
-                
-            if line.startswith("y-axis:"):
-                value = line[7:].strip()
-                parts = value.split("|")
-                if len(parts) >= 1:
-                    config["y_axis_high"] = self._clean_label(parts[0])
+
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+
+            if key == "y-axis":
+                parts = value.strip().split("|")
+                config["y_axis_high"] = self._clean_label(parts[0])
                 if len(parts) >= 2:
                     config["y_axis_low"] = self._clean_label(parts[1])
-                    
-            elif line.startswith("x-axis:"):
-                value = line[7:].strip()
+
+            elif key == "x-axis":
+                value = value.strip()
                 if (value.startswith('"') and value.endswith('"')) or \
                    (value.startswith("'") and value.endswith("'")):
                     value = value[1:-1]
                 config["x_axis"] = value
 
-            elif line.startswith("ticks:"):
-                value = line[6:].strip()
+            elif key == "ticks":
+                value = value.strip()
                 if value.lower() == "auto":
                     config["ticks_mode"] = "auto"
                 elif value.lower() == "manual":
@@ -118,19 +199,17 @@ class PulseWaveformProcessor(SVGProcessorBase):
                 else:
                     config["ticks"] = value.split()
                     config["ticks_mode"] = "manual"
-            
-            elif line.startswith("grid:"):
-                value = line[5:].strip().lower()
-                config["grid"] = value == "true"
-                
-            elif line.startswith("pulses:"):
-                config["pulses"] = self._parse_pulses(line[7:].strip())
-                
-            elif ":" in line:
-                key, value = line.split(":", 1)
+
+            elif key == "grid":
+                config["grid"] = value.strip().lower() == "true"
+
+            elif key == "pulses":
+                config["pulses"] = self._parse_pulses(value.strip())
+
+            else:
                 key = self._clean_label(key)
-                
-                if key not in ["y-axis", "x-axis", "pulses", "width", "height", "centered", "ticks", "grid"]:
+
+                if key not in self._RESERVED_KEYS:
                     has_group_channels = True
                     config["channels"].append({
                         "name": key,
@@ -203,80 +282,88 @@ class PulseWaveformProcessor(SVGProcessorBase):
             text = text[1:-1]
         return text.replace("\\n", "\n")
 
-    def _parse_pulses(self, pulse_string: str) -> list:
+    def _parse_pulses(self, pulse_string: str) -> tuple:
         """Parse pulse string into segments.
-        
+
         Syntax: Each character represents one time unit:
         - `-` = high state
-        - `.` = low state  
+        - `.` = low state
         - `|` = tick marker (zero width)
-        
-        Returns list of (type, width) tuples where:
+
+        Returns tuple of (type, width) tuples where:
         - type: 'high', 'low', or 'marker'
         - width: number of units * UNIT_WIDTH
         """
+        cached = self._PULSE_MEMO.get(pulse_string)
+        if cached is not None:
+            return cached
+
         pulses = []
-        i = 0
-        
-        while i < len(pulse_string):
-            char = pulse_string[i]
-            
-            if char == '|':
+
+        for token in self._PULSE_TOKEN.finditer(pulse_string):
+            group = token.lastindex
+            if group == 3:
                 pulses.append(('marker', 0))
-                i += 1
-            elif char == '-':
-                count = 0
-                while i < len(pulse_string) and pulse_string[i] == '-':
-                    count += 1
-                    i += 1
-                pulses.append(('high', count * self.UNIT_WIDTH))
-            elif char == '.':
-                count = 0
-                while i < len(pulse_string) and pulse_string[i] == '.':
-                    count += 1
-                    i += 1
-                pulses.append(('low', count * self.UNIT_WIDTH))
+                continue
+
+            p_type = 'high' if group == 1 else 'low'
+            width = (token.end() - token.start()) * self.UNIT_WIDTH
+
+            # Runs of the same state separated only by ignored characters are
+            # coalesced so the path emits one segment per flat stretch.
+            if pulses and pulses[-1][0] == p_type:
+                pulses[-1] = (p_type, pulses[-1][1] + width)
             else:
-                i += 1
-        return pulses
+                pulses.append((p_type, width))
 
-    def _collect_markers(self, pulses, start_x: float, mode='manual') -> list:
-        """Calculate X positions of markers.
-        
-        mode='manual': only where pulse_type == 'marker' (|)
-        mode='auto': at every time unit (every character)
+        result = tuple(pulses)
+        self._PULSE_MEMO[pulse_string] = result
+        return result
+
+    def _scan_pulses(self, pulses, start_x: float, mode='manual') -> tuple:
+        """Return (total pulse width, marker X positions) in one pass.
+
+        mode='manual': markers only where pulse_type == 'marker' (|)
+        mode='auto': markers at every time unit (every character)
+
+        The markers already advance a cumulative X over the pulse list, so
+        the total width falls out of the same loop instead of a separate
+        sum() traversal per channel.
         """
+        unit_width = self.UNIT_WIDTH
+
         markers = []
         current_x = start_x
         markers.append(current_x)
-        
+
         for p_type, width in pulses:
             if p_type == 'marker':
                 markers.append(current_x)
             else:
                 if mode == 'auto':
-                    num_units = int(width / self.UNIT_WIDTH)
+                    num_units = int(width / unit_width)
                     for _ in range(num_units):
-                        current_x += self.UNIT_WIDTH
+                        current_x += unit_width
                         markers.append(current_x)
                 else:
                     current_x += width
-        
-        return sorted(list(set(markers)))
+
+        # current_x never decreases, so markers come out sorted; duplicates
+        # (adjacent '|' at the same X) are dropped without a full re-sort.
+        return current_x - start_x, list(dict.fromkeys(markers))
 
     def _render_single_waveform(self, config: dict) -> bytes:
         pulses = config["pulses"]
-        pulse_width = sum(p[1] for p in pulses) if pulses else 0
         ticks_mode = config.get("ticks_mode", "manual")
-        
+
         y_high = config.get("y_axis_high", "")
         y_low = config.get("y_axis_low", "")
         x_axis_label = config.get("x_axis", "")
-        
+
         left_padding = self._calculate_left_padding(y_high, y_low)
         start_x = left_padding
-        
-        markers = self._collect_markers(pulses, start_x, mode=ticks_mode)
+
+        pulse_width, markers = self._scan_pulses(pulses, start_x, mode=ticks_mode)
         tick_labels = config.get("ticks", [])
 
         top_padding = self.ARROW_SIZE + self.MARGIN_SAFETY
@@ -309,48 +396,45 @@ class PulseWaveformProcessor(SVGProcessorBase):
         x_label_start = x_axis_end + self.ARROW_TEXT_GAP
         y_axis_top = high_y - self.ARROW_SIZE
         
-        svg_parts = self._generate_svg_header(svg_width, svg_height)
-        
+        # Single waveforms inline their two arrowheads as polygons instead of
+        # shipping the <defs> marker block: fewer bytes per SVG and no defs
+        # lookup in the consumer.
+        svg_parts = self._generate_svg_header(svg_width, svg_height, include_marker=False)
+
         svg_parts.extend(self._draw_grid_and_ticks(
-            markers, tick_labels, top_padding, baseline_y + 12, 
+            markers, tick_labels, top_padding, baseline_y + 12,
             grid_bottom_y=baseline_y,
             show_grid=config.get("grid", False), zebra=config.get("grid", False),
             ticks_mode=ticks_mode
         ))
 
-        svg_parts.append(f'<line x1="{start_x}" y1="{baseline_y + 5}" x2="{start_x}" y2="{y_axis_top}" stroke="{self.AXIS_COLOR}" stroke-width="1.5" marker-end="url(#arrowhead)"/>')
-        svg_parts.append(f'<line x1="{start_x}" y1="{axis_line_y}" x2="{x_axis_end}" y2="{axis_line_y}" stroke="{self.AXIS_COLOR}" stroke-width="1.5" marker-end="url(#arrowhead)"/>')
+        svg_parts.append(f'<line x1="{start_x}" y1="{baseline_y + 5}" x2="{start_x}" y2="{y_axis_top}" {self._AXIS_LINE_PLAIN_ATTRS}/>')
+        svg_parts.append(self._arrow_head(start_x, y_axis_top, "up"))
+        svg_parts.append(f'<line x1="{start_x}" y1="{axis_line_y}" x2="{x_axis_end}" y2="{axis_line_y}" {self._AXIS_LINE_PLAIN_ATTRS}/>')
+        svg_parts.append(self._arrow_head(x_axis_end, axis_line_y, "right"))
         
         path_d = self._generate_waveform_path(pulses, start_x, baseline_y, high_y)
-        svg_parts.append(f'<path d="{path_d}" fill="none" stroke="{self.PULSE_COLOR}" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round"/>')
+        svg_parts.append(f'<path d="{path_d}" {self._PATH_ATTRS}/>')
         
         svg_parts.append('<!-- Labels -->')
         if y_high:
-            svg_parts.extend(self._generate_text(y_high, start_x - self.TEXT_GAP, high_y + 5, 9, "end"))
+            self._write_text(svg_parts, y_high, start_x - self.TEXT_GAP, high_y + 5, 9, "end")
         if y_low:
-            svg_parts.extend(self._generate_text(y_low, start_x - self.TEXT_GAP, baseline_y + 5, 9, "end"))
+            self._write_text(svg_parts, y_low, start_x - self.TEXT_GAP, baseline_y + 5, 9, "end")
         if x_axis_label:
-            svg_parts.extend(self._generate_text(x_axis_label, x_label_start, axis_line_y + 4, 10, "start"))
+            self._write_text(svg_parts, x_axis_label, x_label_start, axis_line_y + 4, 10, "start")
         
         svg_parts.append('</svg>')
-        return ''.join(part for part in svg_parts if part).encode('utf-8')
+        return ''.join(svg_parts).encode('utf-8')
 
     def _render_group_waveform(self, config: dict) -> bytes:
         channels = config["channels"]
         num_channels = len(channels)
         ticks_mode = config.get("ticks_mode", "manual")
         
-        max_pulse_width = 0
-        max_channel_name_width = 0
-        
-        for ch in channels:
-            w = sum(p[1] for p in ch["pulses"])
-            if w > max_pulse_width:
-                max_pulse_width = w
-            
-            name_width = self._estimate_text_width(ch["name"], 11)
-            if name_width > max_channel_name_width:
-                max_channel_name_width = name_width
+        max_channel_name_width = max(
+            (self._estimate_text_width(ch["name"], 11) for ch in channels), default=0
+        )
         
         tick_labels = config.get("ticks", [])
         x_axis_label = config.get("x_axis", "")
@@ -358,11 +442,17 @@ class PulseWaveformProcessor(SVGProcessorBase):
         left_padding = max_channel_name_width + self.TEXT_GAP + self.MARGIN_SAFETY
         start_x = left_padding
         
-        all_markers = set()
+        # One pass per channel yields both its total width and its markers.
+        max_pulse_width = 0
+        per_channel_markers = []
         for ch in channels:
-            ch_markers = self._collect_markers(ch["pulses"], start_x, mode=ticks_mode)
-            all_markers.update(ch_markers)
-        sorted_markers = sorted(list(all_markers))
+            ch_width, ch_markers = self._scan_pulses(ch["pulses"], start_x, mode=ticks_mode)
+            if ch_width > max_pulse_width:
+                max_pulse_width = ch_width
+            per_channel_markers.append(ch_markers)
+        # Each channel's markers arrive sorted, so a k-way merge with an
+        # order-preserving dedupe replaces the set union plus full sort.
+        sorted_markers = list(dict.fromkeys(heapq.merge(*per_channel_markers)))
         
         top_padding = 5
         
@@ -390,24 +480,24 @@ class PulseWaveformProcessor(SVGProcessorBase):
             ticks_mode=ticks_mode
         ))
 
-        svg_parts.append(f'<line x1="{start_x}" y1="{axis_line_y}" x2="{x_axis_end}" y2="{axis_line_y}" stroke="{self.AXIS_COLOR}" stroke-width="1.5" marker-end="url(#arrowhead)"/>')
+        svg_parts.append(f'<line x1="{start_x}" y1="{axis_line_y}" x2="{x_axis_end}" y2="{axis_line_y}" {self._AXIS_LINE_ATTRS}/>')
         if x_axis_label:
-            svg_parts.extend(self._generate_text(x_axis_label, x_label_start, axis_line_y + 4, 10, "start"))
+            self._write_text(svg_parts, x_axis_label, x_label_start, axis_line_y + 4, 10, "start")
 
         for i, channel in enumerate(channels):
             baseline_y = current_y_top + self.PULSE_HEIGHT
             high_y = current_y_top
             
             label_y = current_y_top + (self.PULSE_HEIGHT / 2) + 4
-            svg_parts.extend(self._generate_text(channel["name"], start_x - self.TEXT_GAP, label_y, 11, "end"))
+            self._write_text(svg_parts, channel["name"], start_x - self.TEXT_GAP, label_y, 11, "end")
             
             path_d = self._generate_waveform_path(channel["pulses"], start_x, baseline_y, high_y)
-            svg_parts.append(f'<path d="{path_d}" fill="none" stroke="{self.PULSE_COLOR}" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round"/>')
+            svg_parts.append(f'<path d="{path_d}" {self._PATH_ATTRS}/>')
             
             current_y_top += self.PULSE_HEIGHT + self.CHANNEL_GAP
             
         svg_parts.append('</svg>')
-        return ''.join(part for part in svg_parts if part).encode('utf-8')
+        return ''.join(svg_parts).encode('utf-8')
 
     def _draw_grid_and_ticks(self, markers, tick_labels, top_y, label_y, grid_bottom_y, show_grid=False, zebra=False, ticks_mode="manual") -> list:
         parts = []
@@ -447,9 +537,9 @@ class PulseWaveformProcessor(SVGProcessorBase):
                         should_draw_line = True
                 
                 if should_draw_line:
-                    parts.append(f'<line x1="{x_pos}" y1="{top_y}" x2="{x_pos}" y2="{axis_y}" stroke="{self.GRID_COLOR}" stroke-width="1" stroke-dasharray="2,2"/>')
+                    parts.append(f'<line x1="{x_pos}" y1="{top_y}" x2="{x_pos}" y2="{axis_y}" {self._GRID_LINE_ATTRS}/>')
 
-            parts.append(f'<line x1="{x_pos}" y1="{axis_y}" x2="{x_pos}" y2="{axis_y + 4}" stroke="{self.AXIS_COLOR}" stroke-width="1.5"/>')
+            parts.append(f'<line x1="{x_pos}" y1="{axis_y}" x2="{x_pos}" y2="{axis_y + 4}" {self._TICK_ATTRS}/>')
             
             if i < len(tick_labels):
                 label_text = tick_labels[i]
@@ -458,25 +548,38 @@ class PulseWaveformProcessor(SVGProcessorBase):
                 
         return parts
 
-    def _generate_svg_header(self, width: float, height: float) -> list:
-        return [
-            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}">',
-            '<defs>',
-            f'  <marker id="arrowhead" markerWidth="{self.ARROW_SIZE}" markerHeight="{self.ARROW_SIZE}" refX="{self.ARROW_SIZE-1}" refY="{self.ARROW_SIZE/2}" orient="auto">',
-            f'    <polygon points="0 0, {self.ARROW_SIZE} {self.ARROW_SIZE/2}, 0 {self.ARROW_SIZE}" fill="{self.AXIS_COLOR}" stroke="none"/>',
-            '  </marker>',
-            '</defs>',
-            ''
-        ]
-
-    def _generate_text(self, text: str, x, y, size, align) -> list:
-        parts = []
-        lines = text.split("\n")
-        for i, line in enumerate(lines):
-            dy = i * (size * 1.4)
-            parts.append(f'<text x="{x}" y="{y + dy}" text-anchor="{align}" font-family="system-ui, -apple-system, sans-serif" font-size="{size}" fill="{self.TEXT_COLOR}">{self._escape_xml(line)}</text>')
+    def _generate_svg_header(self, width: float, height: float, include_marker: bool = True) -> list:
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}">']
+        if include_marker:
+            parts.append(self._DEFS_BLOCK)
         return parts
 
+    def _arrow_head(self, tip_x: float, tip_y: float, direction: str) -> str:
+        """Inline arrowhead polygon equivalent to the #arrowhead marker.
+
+        The marker scales with the 1.5 axis stroke width (markerUnits
+        defaults to strokeWidth) and anchors refX one unit behind the tip;
+        the offsets below bake that transform in.
+        """
+        scale = 1.5
+        back = (self.ARROW_SIZE - 1) * scale
+        half = (self.ARROW_SIZE / 2) * scale
+        tip = scale
+        if direction == "right":
+            points = f"{tip_x - back} {tip_y - half}, {tip_x + tip} {tip_y}, {tip_x - back} {tip_y + half}"
+        else:  # up
+            points = f"{tip_x - half} {tip_y + back}, {tip_x} {tip_y - tip}, {tip_x + half} {tip_y + back}"
+        return f'<polygon points="{points}" fill="{self.AXIS_COLOR}" stroke="none"/>'
+
+    def _write_text(self, out: list, text: str, x, y, size, align) -> None:
+        """Append <text> elements for a potentially multiline label to out."""
+        if "\n" not in text:
+            out.append(f'<text x="{x}" y="{y}" text-anchor="{align}" font-family="system-ui, -apple-system, sans-serif" font-size="{size}" fill="{self.TEXT_COLOR}">{self._escape_xml(text)}</text>')
+            return
+        for i, line in enumerate(text.split("\n")):
+            dy = i * (size * 1.4)
+            out.append(f'<text x="{x}" y="{y + dy}" text-anchor="{align}" font-family="system-ui, -apple-system, sans-serif" font-size="{size}" fill="{self.TEXT_COLOR}">{self._escape_xml(line)}</text>')
+
     def _generate_waveform_path(self, pulses, start_x, baseline_y, high_y) -> str:
         """Generate SVG path for waveform.
         
@@ -484,28 +587,23 @@ class PulseWaveformProcessor(SVGProcessorBase):
         """
         current_x = start_x
         current_y = baseline_y
-        path_d = f"M {current_x} {current_y}"
-        
+        segments = [f"M {current_x} {current_y}"]
+
         for pulse_type, width in pulses:
             if pulse_type == 'marker':
                 continue
-            
+
             target_y = high_y if pulse_type == 'high' else baseline_y
-            
+
             if target_y != current_y:
-                path_d += f" L {current_x} {target_y}"
+                segments.append(f"L {current_x} {target_y}")
                 current_y = target_y
-            
+
             current_x += width
-            path_d += f" L {current_x} {current_y}"
-        
-        return path_d
+            segments.append(f"L {current_x} {current_y}")
+
+        return " ".join(segments)
 
     def _escape_xml(self, text: str) -> str:
         """Escape special XML characters."""
-        return (text
-                .replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace('"', "&quot;")
-                .replace("'", "&#39;"))
+        return text.translate(self._XML_ESC)
@@ -147,9 +147,15 @@ class SchemdrawProcessor(SVGProcessorBase):
     pattern = SVGProcessorBase.create_pattern("schemdraw.plot", "")
 
     def execute(self, node: ContentNode, content: str) -> str:
-        matches = list(self.pattern.finditer(content))
+        if not self.has_block(content):
+            return content
 
-        for match in matches:
+        # Rebuild the document in one pass over the match spans instead of
+        # rescanning and copying the whole string with content.replace.
+        parts: list[str] = []
+        last_end = 0
+
+        for match in self.pattern.finditer(content):
             code = match.group("content").strip()
             attrs = self.parse_svg_attributes(match)
 
@@ -172,17 +178,22 @@ class SchemdrawProcessor(SVGProcessorBase):
 
                 # Keep the outer wrapper aligned with the requested layout.
                 outer_classes = "no-break centered" if attrs["centered"] else "no-break"
-                svg_html = f'<div class="{outer_classes}">{svg_html}</div>'
-
-                content = content.replace(match.group(0), svg_html)
+                replacement = f'<div class="{outer_classes}">{svg_html}</div>'
             except Exception as e:
                 # In case of error, we can either leave the code block or show an error
                 # For now, let's just log it or re-raise if we want to fail fast
                 # A common pattern is to replace it with an error message
-                error_msg = f'<div class="error">Schemdraw error: {str(e)}</div>'
-                content = content.replace(match.group(0), error_msg)
+                replacement = f'<div class="error">Schemdraw error: {str(e)}</div>'
+
+            parts.append(content[last_end:match.start()])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if not parts:
+            return content
 
-        return content
+        parts.append(content[last_end:])
+        return "".join(parts)
 
     def _render_schemdraw(self, code: str) -> bytes:
         """Execute schemdraw code and return SVG bytes."""
@@ -10,13 +10,30 @@ from course_forge.domain.entities import ContentNode
 
 from .base import Processor
 
+# Serialize inline SVG without ns0: prefixes. Previously this registration
+# happened as an import side effect of the rendering stacks; with processors
+# imported lazily it must be explicit here, where the serialization lives.
+ET.register_namespace("", "http://www.w3.org/2000/svg")
+ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+
 
 class SVGProcessorBase(Processor):
     """Base class for processors that generate SVG graphics with common metadata extraction."""
 
+    __slots__ = ()
+
     _XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
     _MATPLOTLIB_RENDER_LOCK = threading.RLock()
 
+    # Literal fence marker per compiled pattern, registered by create_pattern,
+    # so execute can reject documents without the fence via a substring scan
+    # instead of running the full DOTALL regex.
+    _PATTERN_MARKERS: dict[re.Pattern, str] = {}
+
+    # In-process layer over the on-disk SVG cache, keyed by cache file path,
+    # so blocks repeated across pages skip even the cache-file read.
+    _SVG_MEMORY_CACHE: dict[str, bytes] = {}
+
     def build_svg_id_prefix(
         self,
         processor_name: str,
@@ -30,24 +47,13 @@ class SVGProcessorBase(Processor):
         content_hash = hashlib.sha256(hash_input.encode("utf-8")).hexdigest()[:12]
         return f"svg-{processor_name}-{content_hash}"
 
-    def get_cached_svg_or_render(
+    def _svg_cache_path(
         self,
         processor_name: str,
         code_to_hash: str,
-        render_func: Callable,
-        *args,
         node: ContentNode | None = None,
-        **kwargs,
-    ) -> bytes:
-        """Cache mechanism to avoid recompiling heavy SVG graphics if the markdown block hasn't changed.
-
-        Args:
-            processor_name: A unique name for the processor (e.g. 'schemdraw', 'graphviz')
-            code_to_hash: The full code block to compute the hash from (helps distinguish configs).
-            render_func: Callable that generates the SVG bytes.
-            node: The content node being processed (used to isolate cache per file).
-            *args, **kwargs: Passed to render_func.
-        """
+    ) -> str:
+        """Compute the on-disk cache path for a rendered SVG block."""
         cache_dir = os.path.join(os.getcwd(), ".course_forge_cache", processor_name)
         os.makedirs(cache_dir, exist_ok=True)
 
@@ -58,23 +64,62 @@ class SVGProcessorBase(Processor):
             hash_input = f"{processor_name}:{node.src_path}:{code_to_hash}"
 
         content_hash = hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
-        cache_file = os.path.join(cache_dir, f"{content_hash}.svg")
+        return os.path.join(cache_dir, f"{content_hash}.svg")
+
+    @classmethod
+    def _read_cached_svg(cls, cache_file: str) -> bytes | None:
+        """Return cached SVG bytes, or None on a cache miss."""
+        cached = cls._SVG_MEMORY_CACHE.get(cache_file)
+        if cached is not None:
+            return cached
 
         if os.path.exists(cache_file):
             try:
                 with open(cache_file, "rb") as f:
-                    return f.read()
+                    svg_data = f.read()
             except IOError:
-                pass
-
-        svg_data = render_func(*args, **kwargs)
-
+                return None
+            cls._SVG_MEMORY_CACHE[cache_file] = svg_data
+            return svg_data
+        return None
+
+    @classmethod
+    def _write_cached_svg(cls, cache_file: str, svg_data: bytes) -> None:
+        """Persist rendered SVG bytes, ignoring cache-write failures."""
+        cls._SVG_MEMORY_CACHE[cache_file] = svg_data
         try:
             with open(cache_file, "wb") as f:
                 f.write(svg_data)
         except IOError:
             pass
 
+    def get_cached_svg_or_render(
+        self,
+        processor_name: str,
+        code_to_hash: str,
+        render_func: Callable,
+        *args,
+        node: ContentNode | None = None,
+        **kwargs,
+    ) -> bytes:
+        """Cache mechanism to avoid recompiling heavy SVG graphics if the markdown block hasn't changed.
+
+        Args:
+            processor_name: A unique name for the processor (e.g. 'schemdraw', 'graphviz')
+            code_to_hash: The full code block to compute the hash from (helps distinguish configs).
+            render_func: Callable that generates the SVG bytes.
+            node: The content node being processed (used to isolate cache per file).
+            *args, **kwargs: Passed to render_func.
+        """
+        cache_file = self._svg_cache_path(processor_name, code_to_hash, node)
+
+        cached = self._read_cached_svg(cache_file)
+        if cached is not None:
+            return cached
+
+        svg_data = render_func(*args, **kwargs)
+        self._write_cached_svg(cache_file, svg_data)
+
         return svg_data
 
     @staticmethod
@@ -88,13 +133,23 @@ class SVGProcessorBase(Processor):
         Returns:
             Compiled regex pattern with width, height, centered, and sketch groups
         """
+        # Both fences are anchored to line starts: the engine then only tries
+        # match candidates at fence lines instead of at every backtick, which
+        # avoids quadratic rescans of the tail on malformed blocks.
         pattern_str = (
-            r"(?P<indent>[ \t]*)"
+            r"^(?P<indent>[ \t]*)"
             rf"```{re.escape(block_type)}"
-            r"(?:\s+(?:width=(?P<width>\d+)|height=(?P<height>\d+)|(?P<centered>centered)|(?P<sketch>sketch)|(?P<leftmost>leftmost)|(?P<rightmost>rightmost)))*"
-            r"[ \t]*\r?\n(?P<content>.*?)```"
+            r"(?:[ \t]+(?:width=(?P<width>\d+)|height=(?P<height>\d+)|(?P<centered>centered)|(?P<sketch>sketch)|(?P<leftmost>leftmost)|(?P<rightmost>rightmost)))*"
+            r"[ \t]*\r?\n(?P<content>.*?)^[ \t]*```"
         )
-        return re.compile(pattern_str, re.DOTALL)
+        pattern = re.compile(pattern_str, re.DOTALL | re.MULTILINE)
+        SVGProcessorBase._PATTERN_MARKERS[pattern] = f"```{block_type}"
+        return pattern
+
+    def has_block(self, content: str, pattern: re.Pattern | None = None) -> bool:
+        """Cheap literal prescreen for this processor's fenced block."""
+        marker = self._PATTERN_MARKERS.get(pattern if pattern is not None else self.pattern)
+        return marker is None or marker in content
 
     @staticmethod
     def parse_svg_attributes(match: re.Match) -> dict[str, Any]: